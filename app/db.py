@@ -1,5 +1,13 @@
 import os
-from sqlmodel import create_engine, SQLModel, Session, select
+import time
+from datetime import date
+from itertools import pairwise
+from typing import Iterable, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession, object_session
+from sqlmodel import create_engine, SQLModel, Session, select, func
+
+from app.models import Highlight, Settings
 
 # Module-level engine singleton — created once when the module is first imported.
 _engine = create_engine(
@@ -9,6 +17,19 @@ _engine = create_engine(
 )
 
 
+@event.listens_for(_engine, "connect")
+def _configure_sqlite(dbapi_connection, connection_record):
+    """Use WAL journaling so readers no longer block the writer.
+
+    synchronous stays at SQLite's default (FULL), so every commit is still durable.
+    """
+    if _engine.dialect.name != "sqlite":
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
+
+
 def get_engine():
     """Return the module-level SQLAlchemy engine singleton."""
     return _engine
@@ -20,9 +41,12 @@ def get_session():
         yield session
 
 
-def get_settings(session: Session):
-    """Return the single Settings record, creating defaults if absent."""
-    from app.models import Settings
+def load_settings(session: Session):
+    """Return the live Settings record, creating defaults if absent.
+
+    Use this when the row is going to be modified; read-only callers should
+    prefer get_settings().
+    """
     settings = session.exec(select(Settings)).first()
     if not settings:
         settings = Settings()
@@ -37,37 +61,149 @@ def get_settings(session: Session):
     return settings
 
 
-def get_current_streak(session: Session) -> int:
-    """Return the current consecutive-day review streak (0 if no active streak).
+# In-process caches are invalidated by ORM events in this process only; the TTL
+# bounds staleness when several worker processes share one database.
+CACHE_TTL_SECONDS = 5.0
 
-    A streak is alive if a completed session exists for today or yesterday.
-    Multiple sessions on the same calendar day count as one streak day.
+
+def _cache_expired(entry: Optional[Tuple[float, object]], now: float) -> bool:
+    """True if a (loaded_at, value) cache entry is missing or older than CACHE_TTL_SECONDS."""
+    return entry is None or now - entry[0] > CACHE_TTL_SECONDS
+
+
+# Cached Settings column values as (loaded_at, values); None means "reload on next read".
+_settings_cache: Optional[Tuple[float, dict]] = None
+
+
+def get_settings(session: Session):
+    """Return a detached copy of the Settings record, served from cache until settings change."""
+    global _settings_cache
+    now = time.monotonic()
+    if _cache_expired(_settings_cache, now):
+        _settings_cache = (now, load_settings(session).model_dump())
+    return Settings(**_settings_cache[1])
+
+
+def invalidate_settings() -> None:
+    """Drop the cached Settings values (e.g. after tables are recreated)."""
+    global _settings_cache
+    _settings_cache = None
+
+
+# Cached total highlight count as (loaded_at, count); None means "recompute on next read".
+_highlight_count: Optional[Tuple[float, int]] = None
+
+
+def get_highlight_count(session: Session) -> int:
+    """Return the total number of highlights, served from cache until highlights change."""
+    global _highlight_count
+    now = time.monotonic()
+    if _cache_expired(_highlight_count, now):
+        _highlight_count = (now, session.exec(select(func.count()).select_from(Highlight)).one())
+    return _highlight_count[1]
+
+
+def invalidate_highlight_count() -> None:
+    """Drop the cached highlight count (e.g. after tables are recreated)."""
+    global _highlight_count
+    _highlight_count = None
+
+
+@event.listens_for(Highlight, "after_insert")
+@event.listens_for(Highlight, "after_delete")
+def _highlight_rows_changed(mapper, connection, target):
+    """Invalidate at flush time and flag the owning session to invalidate again on commit.
+
+    Invalidating on commit as well prevents a concurrent read between flush and
+    commit from caching the pre-commit count.
     """
-    from app.models import ReviewSession
-    from datetime import date, timedelta
+    invalidate_highlight_count()
+    owner = object_session(target)
+    if owner is not None:
+        owner.info["highlights_changed"] = True
+
+
+@event.listens_for(Settings, "after_insert")
+@event.listens_for(Settings, "after_update")
+@event.listens_for(Settings, "after_delete")
+def _settings_row_changed(mapper, connection, target):
+    """Same flush-and-commit invalidation as for highlights, for the Settings cache."""
+    invalidate_settings()
+    owner = object_session(target)
+    if owner is not None:
+        owner.info["settings_changed"] = True
+
 
-    today = date.today()
-    completed_stmt = select(ReviewSession).where(ReviewSession.is_completed == True)
-    completed_sessions = session.exec(completed_stmt).all()
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_caches_on_commit(session):
+    if session.info.pop("highlights_changed", False):
+        invalidate_highlight_count()
+    if session.info.pop("settings_changed", False):
+        invalidate_settings()
 
-    if not completed_sessions:
-        return 0
 
-    # Deduplicate: multiple sessions on the same day count as one streak day
-    sorted_dates = sorted({rs.session_date for rs in completed_sessions}, reverse=True)
-    yesterday = today - timedelta(days=1)
+@event.listens_for(OrmSession, "after_rollback")
+def _clear_change_flags(session):
+    session.info.pop("highlights_changed", None)
+    session.info.pop("settings_changed", None)
 
-    # Streak must start from today or yesterday to be "current"
-    if sorted_dates[0] < yesterday:
-        return 0
 
-    streak = 1
-    check_date = sorted_dates[0] - timedelta(days=1)
-    for d in sorted_dates[1:]:
-        if d == check_date:
-            streak += 1
-            check_date -= timedelta(days=1)
+def calculate_streaks(session_dates: Iterable[date], today: Optional[date] = None) -> Tuple[int, int]:
+    """Return (current, longest) consecutive-day streaks for the given review dates.
+
+    A streak is current if its last day is today or yesterday. Repeated dates
+    count as one streak day.
+    """
+    ordinals = sorted({d.toordinal() for d in session_dates})
+    if not ordinals:
+        return 0, 0
+    today = today or date.today()
+
+    # One forward pass: `run` ends up as the length of the run ending at the latest date
+    run = longest = 1
+    for previous, ordinal in pairwise(ordinals):
+        if ordinal - previous == 1:
+            run += 1
+            longest = max(longest, run)
         else:
-            break
+            run = 1
+
+    current = run if ordinals[-1] >= today.toordinal() - 1 else 0
+    return current, longest
+
+
+def current_streak(review_dates_desc: Iterable[date], today: Optional[date] = None) -> int:
+    """Return the current streak from distinct review dates ordered newest first.
 
+    Stops at the first gap, so the rest of the history is never read.
+    """
+    today_ordinal = (today or date.today()).toordinal()
+    streak = 0
+    previous = None
+    for d in review_dates_desc:
+        ordinal = d.toordinal()
+        if previous is None:
+            if ordinal < today_ordinal - 1:
+                return 0
+        elif previous - ordinal != 1:
+            break
+        streak += 1
+        previous = ordinal
     return streak
+
+
+def get_current_streak(session: Session) -> int:
+    """Return the current consecutive-day review streak (0 if no active streak).
+
+    A streak is alive if a completed session exists for today or yesterday.
+    Multiple sessions on the same calendar day count as one streak day.
+    """
+    from app.models import ReviewSession
+
+    review_dates_stmt = (
+        select(ReviewSession.session_date)
+        .where(ReviewSession.is_completed == True)
+        .distinct()
+        .order_by(ReviewSession.session_date.desc())
+    )
+    return current_streak(session.exec(review_dates_stmt))
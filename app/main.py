@@ -3,7 +3,6 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 from sqlmodel import Session
 
 from app.db import get_engine, get_settings, get_current_streak
@@ -48,8 +47,7 @@ async def inject_streak(request: Request, call_next):
     return await call_next(request)
 
 
-# Setup templates and static files
-templates = Jinja2Templates(directory="app/templates")
+# Setup static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
 # Include routers
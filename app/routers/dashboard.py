@@ -1,16 +1,15 @@
 from typing import Dict
 from fastapi import APIRouter, Depends, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlmodel import Session, select, func
 from datetime import datetime, date
 
-from app.db import get_session, get_settings, get_current_streak
+from app.db import get_session, get_settings, calculate_streaks
 from app.models import Book, Highlight, Settings, ReviewSession
+from app.templating import templates
 
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
-templates = Jinja2Templates(directory="app/templates")
 
 
 
@@ -76,33 +75,18 @@ async def ui_dashboard(
         str(row[0]): row[1] for row in session.exec(heatmap_stmt).all()
     }
     
-    # Get review session data for review activity heatmap
-    review_sessions_stmt = select(ReviewSession).where(ReviewSession.is_completed == True)
-    completed_sessions = session.exec(review_sessions_stmt).all()
-    
+    # Distinct completed review days feed both the review heatmap and the streaks
+    review_dates_stmt = (
+        select(ReviewSession.session_date)
+        .where(ReviewSession.is_completed == True)
+        .distinct()
+    )
+    review_dates = session.exec(review_dates_stmt).all()
+
     # Create binary heatmap data (1 if reviewed that day, 0 otherwise)
-    review_heatmap_data: Dict[str, int] = {}
-    for review_session in completed_sessions:
-        date_key = review_session.session_date.isoformat()
-        review_heatmap_data[date_key] = 1  # Binary: reviewed or not
-    
-    # Current streak — shared utility (same logic used by the nav middleware)
-    current_streak = get_current_streak(session)
-    longest_streak = 0
+    review_heatmap_data: Dict[str, int] = {d.isoformat(): 1 for d in review_dates}
 
-    if completed_sessions:
-        # Longest ever streak; deduplicate same-day sessions first
-        all_dates_sorted = sorted({rs.session_date for rs in completed_sessions})
-        if all_dates_sorted:
-            temp_streak = 1
-            longest_streak = 1
-            for i in range(1, len(all_dates_sorted)):
-                days_diff = (all_dates_sorted[i] - all_dates_sorted[i - 1]).days
-                if days_diff == 1:
-                    temp_streak += 1
-                    longest_streak = max(longest_streak, temp_streak)
-                else:
-                    temp_streak = 1
+    current_streak, longest_streak = calculate_streaks(review_dates)
 
     return templates.TemplateResponse("dashboard.html", {
         "request": request,
@@ -6,16 +6,15 @@ import random
 import uuid
 from fastapi import APIRouter, Depends, HTTPException, Request, Form, Cookie
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlmodel import Session, select, func
 from pydantic import BaseModel
 
 from app.db import get_session, get_settings
 from app.models import Highlight, ReviewSession
+from app.templating import templates
 
 
 router = APIRouter(prefix="/highlights", tags=["highlights"])
-templates = Jinja2Templates(directory="app/templates")
 
 # In-memory session storage for review queues
 # Format: {session_id: {"highlight_ids": [int], "current_index": int, "timestamp": datetime}}
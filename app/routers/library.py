@@ -1,25 +1,45 @@
 from typing import Optional, List
-from fastapi import APIRouter, Depends, Request, Form, File, UploadFile, HTTPException
+from fastapi import APIRouter, Depends, Query, Request, Response, Form, File, UploadFile, HTTPException
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from sqlmodel import Session, select, func
+from sqlmodel import Session, select, func, delete
 from datetime import datetime
+from collections import OrderedDict
+import asyncio
+import functools
 import os
+import re
+import time
 import uuid
 import aiofiles
 import httpx
 
-from app.db import get_session, get_settings
+from app.db import get_session, get_settings, invalidate_highlight_count
 from app.models import Book, Highlight, Settings
+from app.templating import templates, TEMPLATE_CACHE_ENABLED
 
 
 router = APIRouter(prefix="/library", tags=["library"])
-templates = Jinja2Templates(directory="app/templates")
 
 COVER_UPLOAD_DIR = os.path.join("app", "static", "uploads", "covers")
 ALLOWED_COVER_TYPES = {"image/jpeg", "image/png", "image/webp"}
 ALLOWED_COVER_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+COVER_EXTENSION_BY_TYPE = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+}
+OPENLIBRARY_COVER_URL_RE = re.compile(r"^https?://covers\.openlibrary\.org/")
 MAX_COVER_SIZE_BYTES = 5 * 1024 * 1024
+COVER_DOWNLOAD_CHUNK_BYTES = 64 * 1024
+LIBRARY_PAGE_SIZE = 50
+LIBRARY_MAX_PAGE_SIZE = 200
+# Keeps page * page_size far inside SQLite's 64-bit OFFSET range
+LIBRARY_MAX_PAGE = 100_000
+
+# Short-lived LRU cache of Open Library search results, keyed by normalized query
+SEARCH_CACHE_TTL_SECONDS = 600
+SEARCH_CACHE_MAX_ENTRIES = 256
+_search_cache: "OrderedDict[str, tuple[float, list[dict]]]" = OrderedDict()
 
 
 @router.get("/ui", response_class=HTMLResponse)
@@ -27,13 +47,16 @@ async def ui_library(
     request: Request,
     sort: Optional[str] = "title",
     order: Optional[str] = "asc",
+    page: int = Query(0, ge=0, le=LIBRARY_MAX_PAGE),
+    page_size: int = Query(LIBRARY_PAGE_SIZE, ge=1, le=LIBRARY_MAX_PAGE_SIZE),
     session: Session = Depends(get_session)
 ):
     """
-    Render library page with sortable table of books.
+    Render library page with sortable, paginated table of books.
     
     Sort options: title, author, highlight_count, last_updated
     Order options: asc, desc
+    Pages are zero-based; out-of-range page or page_size values are rejected with 422.
     """
     # Get settings for theme
     settings = get_settings(session)
@@ -74,31 +97,28 @@ async def ui_library(
     else:
         sort_col = Book.title
     
+    # Book.id breaks ties so rows never shift between pages
     if order == "desc":
-        books_query = books_query.order_by(sort_col.desc())
+        books_query = books_query.order_by(sort_col.desc(), Book.id)
     else:
-        books_query = books_query.order_by(sort_col.asc())
-    
-    results = session.exec(books_query).all()
+        books_query = books_query.order_by(sort_col.asc(), Book.id)
+
+    total_books = session.exec(select(func.count()).select_from(Book)).one()
+    books_query = books_query.limit(page_size).offset(page * page_size)
     
-    # Convert results to list of dicts for template
-    books = []
-    for result in results:
-        books.append({
-            "id": result.id,
-            "title": result.title,
-            "author": result.author or "Unknown",
-            "document_tags": result.document_tags,
-            "highlight_count": result.highlight_count,
-            "last_highlight_date": result.last_highlight_date
-        })
+    # Rows support attribute access, so the template reads them directly
+    books = session.exec(books_query).all()
     
     return templates.TemplateResponse("library.html", {
         "request": request,
         "settings": settings,
         "books": books,
+        "total_books": total_books,
         "current_sort": sort,
-        "current_order": order
+        "current_order": order,
+        "page_size": page_size,
+        "prev_page": page - 1 if page > 0 else None,
+        "next_page": page + 1 if (page + 1) * page_size < total_books else None,
     })
 
 
@@ -119,8 +139,18 @@ async def ui_book_detail(
     
     # Get all highlights for this book, ordered by location if available, then by date
     # Order: location ASC (if available), created_at DESC (for fallback)
+    # Only the columns read by book_detail.html / _book_highlight.html are fetched
     highlights_stmt = (
-        select(Highlight)
+        select(
+            Highlight.id,
+            Highlight.text,
+            Highlight.note,
+            Highlight.location_type,
+            Highlight.location,
+            Highlight.created_at,
+            Highlight.is_favorited,
+            Highlight.is_discarded,
+        )
         .where(Highlight.book_id == book_id)
         .order_by(
             Highlight.location.asc().nullslast(),  # Location first (page/order), nulls last
@@ -161,8 +191,8 @@ async def ui_book_cover_upload(
     if len(content) > MAX_COVER_SIZE_BYTES:
         raise HTTPException(status_code=400, detail="File is too large")
 
-    _delete_existing_cover_file(book)
-    os.makedirs(COVER_UPLOAD_DIR, exist_ok=True)
+    await _fs(_delete_existing_cover_file, book)
+    await _fs(os.makedirs, COVER_UPLOAD_DIR, exist_ok=True)
     filename = f"book-{book_id}-{uuid.uuid4().hex}{ext}"
     file_path = os.path.join(COVER_UPLOAD_DIR, filename)
 
@@ -171,11 +201,8 @@ async def ui_book_cover_upload(
 
     book.cover_image_url = f"/static/uploads/covers/{filename}"
     book.cover_image_source = "upload"
-    session.add(book)
-    session.commit()
-    session.refresh(book)
 
-    return _render_cover_section(request, book)
+    return _commit_and_render_cover(session, request, book)
 
 
 @router.post("/ui/book/{book_id}/cover/search", response_class=HTMLResponse)
@@ -194,32 +221,15 @@ async def ui_book_cover_search(
     if not search_query:
         return _render_cover_search_results(request, book_id, [], "")
 
-    results: list[dict] = []
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(
-                "https://openlibrary.org/search.json",
-                params={"q": search_query, "limit": 8}
-            )
-            response.raise_for_status()
-            data = response.json()
-    except httpx.HTTPError:
-        return HTMLResponse(content="<div class=\"text-sm text-gray-500 dark:text-gray-400 text-center\">Open Library search failed. Please try again.</div>")
-
-    for doc in data.get("docs", []):
-        cover_id = doc.get("cover_i")
-        if not cover_id:
-            continue
-        title = doc.get("title") or "Untitled"
-        author_list = doc.get("author_name") or []
-        author = author_list[0] if author_list else "Unknown"
-        year = doc.get("first_publish_year")
-        results.append({
-            "cover_id": cover_id,
-            "title": title,
-            "author": author,
-            "year": year
-        })
+    # Repeat searches (typically the prefilled title) are served from the cache
+    cache_key = " ".join(search_query.lower().split())
+    results = _search_cache_get(cache_key)
+    if results is None:
+        try:
+            results = await _search_openlibrary(search_query)
+        except httpx.HTTPError:
+            return HTMLResponse(content="<div class=\"text-sm text-gray-500 dark:text-gray-400 text-center\">Open Library search failed. Please try again.</div>")
+        _search_cache_put(cache_key, results)
 
     return _render_cover_search_results(request, book_id, results, search_query)
 
@@ -236,59 +246,58 @@ async def ui_book_cover_select(
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
 
-    if not (cover_url.startswith("https://covers.openlibrary.org/") or cover_url.startswith("http://covers.openlibrary.org/")):
+    if not OPENLIBRARY_COVER_URL_RE.match(cover_url):
         raise HTTPException(status_code=400, detail="Invalid cover URL")
 
+    ext = os.path.splitext(cover_url)[1].lower()
+    inferred_ok = ext in ALLOWED_COVER_EXTENSIONS
+
+    # Stream the image into a temporary file so it is never fully buffered in memory
+    await _fs(os.makedirs, COVER_UPLOAD_DIR, exist_ok=True)
+    tmp_path = os.path.join(COVER_UPLOAD_DIR, f"book-{book_id}-{uuid.uuid4().hex}.part")
+    downloaded = False
     try:
         async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(cover_url, follow_redirects=True)
-            response.raise_for_status()
-            content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
-            content = response.content
+            async with client.stream("GET", cover_url, follow_redirects=True) as response:
+                response.raise_for_status()
+                content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+                if content_type and content_type not in ALLOWED_COVER_TYPES and not inferred_ok:
+                    return HTMLResponse(
+                        content="<div class=\"text-sm text-red-600 dark:text-red-400 text-center\">Unsupported cover image type.</div>",
+                        status_code=400
+                    )
+
+                total = 0
+                async with aiofiles.open(tmp_path, "wb") as f:
+                    async for chunk in response.aiter_bytes(COVER_DOWNLOAD_CHUNK_BYTES):
+                        total += len(chunk)
+                        if total > MAX_COVER_SIZE_BYTES:
+                            raise HTTPException(status_code=400, detail="Cover image is too large")
+                        await f.write(chunk)
+        downloaded = True
     except httpx.HTTPError:
         return HTMLResponse(
             content="<div class=\"text-sm text-red-600 dark:text-red-400 text-center\">Failed to download cover image. Please try again.</div>",
             status_code=400
         )
+    finally:
+        if not downloaded:
+            await _fs(_remove_file, tmp_path)
 
-    ext = os.path.splitext(cover_url)[1].lower()
-    inferred_ok = ext in ALLOWED_COVER_EXTENSIONS
-    if content_type and content_type not in ALLOWED_COVER_TYPES and not inferred_ok:
-        return HTMLResponse(
-            content="<div class=\"text-sm text-red-600 dark:text-red-400 text-center\">Unsupported cover image type.</div>",
-            status_code=400
-        )
-
-    if len(content) > MAX_COVER_SIZE_BYTES:
-        raise HTTPException(status_code=400, detail="Cover image is too large")
-
-    ext_map = {
-        "image/jpeg": ".jpg",
-        "image/png": ".png",
-        "image/webp": ".webp",
-    }
-    if content_type in ext_map:
-        ext = ext_map[content_type]
-    elif inferred_ok:
-        ext = os.path.splitext(cover_url)[1].lower()
-    else:
+    if content_type in COVER_EXTENSION_BY_TYPE:
+        ext = COVER_EXTENSION_BY_TYPE[content_type]
+    elif not inferred_ok:
         ext = ".jpg"
 
-    _delete_existing_cover_file(book)
-    os.makedirs(COVER_UPLOAD_DIR, exist_ok=True)
+    await _fs(_delete_existing_cover_file, book)
     filename = f"book-{book_id}-{uuid.uuid4().hex}{ext}"
     file_path = os.path.join(COVER_UPLOAD_DIR, filename)
-
-    async with aiofiles.open(file_path, "wb") as f:
-        await f.write(content)
+    await _fs(os.replace, tmp_path, file_path)
 
     book.cover_image_url = f"/static/uploads/covers/{filename}"
     book.cover_image_source = "openlibrary"
-    session.add(book)
-    session.commit()
-    session.refresh(book)
 
-    return _render_cover_section(request, book)
+    return _commit_and_render_cover(session, request, book)
 
 
 @router.post("/ui/book/{book_id}/cover/delete", response_class=HTMLResponse)
@@ -302,14 +311,11 @@ async def ui_book_cover_delete(
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
 
-    _delete_existing_cover_file(book)
+    await _fs(_delete_existing_cover_file, book)
     book.cover_image_url = None
     book.cover_image_source = None
-    session.add(book)
-    session.commit()
-    session.refresh(book)
 
-    return _render_cover_section(request, book)
+    return _commit_and_render_cover(session, request, book)
 
 
 @router.get("/ui/book/{book_id}/edit", response_class=HTMLResponse)
@@ -352,12 +358,7 @@ async def ui_book_update(
     session.commit()
     session.refresh(book)
     
-    # Get highlight count for the book
-    highlights_stmt = select(Highlight).where(Highlight.book_id == book_id)
-    highlights = session.exec(highlights_stmt).all()
-    highlight_count = len(highlights)
-    
-    return _render_book_header(request, book, highlight_count)
+    return _render_book_header(request, book, _highlight_counts(session, book_id))
 
 
 @router.get("/ui/book/{book_id}/cancel-edit", response_class=HTMLResponse)
@@ -371,12 +372,7 @@ async def ui_book_cancel_edit(
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
     
-    # Get highlight count for the book
-    highlights_stmt = select(Highlight).where(Highlight.book_id == book_id)
-    highlights = session.exec(highlights_stmt).all()
-    highlight_count = len(highlights)
-    
-    return _render_book_header(request, book, highlight_count)
+    return _render_book_header(request, book, _highlight_counts(session, book_id))
 
 
 @router.get("/ui/book/{book_id}/add-tag", response_class=HTMLResponse)
@@ -390,23 +386,10 @@ async def ui_book_add_tag_form(
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
     
-    form_html = f"""
-    <form hx-post="/library/ui/book/{book_id}/add-tag" hx-target="#document-tags-section" hx-swap="innerHTML" style="display: inline-block;">
-        <input 
-            type="text" 
-            name="new_tag" 
-            placeholder="Enter new tag..."
-            style="padding: 8px 12px; border: 1px solid var(--border-color); border-radius: 4px; background: var(--bg-color); color: var(--text-color); min-width: 200px;"
-            autofocus>
-        <button type="submit" style="margin-left: 8px; padding: 8px 16px; background: var(--link-color); color: white; border: none; border-radius: 4px; cursor: pointer;">Add</button>
-        <button type="button" 
-            hx-get="/library/ui/book/{book_id}/cancel-add-tag" 
-            hx-target="#add-tag-form" 
-            hx-swap="innerHTML"
-            style="margin-left: 8px; padding: 8px 16px; background: transparent; color: var(--muted-text); border: 1px solid var(--border-color); border-radius: 4px; cursor: pointer;">Cancel</button>
-    </form>
-    """
-    return HTMLResponse(content=form_html)
+    return templates.TemplateResponse("_add_tag_form.html", {
+        "request": request,
+        "book": book,
+    })
 
 
 @router.post("/ui/book/{book_id}/add-tag", response_class=HTMLResponse)
@@ -488,47 +471,146 @@ async def ui_book_delete(
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
     
-    # Delete all highlights associated with this book
-    highlights_stmt = select(Highlight).where(Highlight.book_id == book_id)
-    highlights = session.exec(highlights_stmt).all()
-    for highlight in highlights:
-        session.delete(highlight)
+    # Delete all highlights associated with this book in a single statement
+    session.exec(delete(Highlight).where(Highlight.book_id == book_id))
     
     # Delete the book
     session.delete(book)
     session.commit()
+    # Bulk deletes bypass the ORM events that keep the cached count current
+    invalidate_highlight_count()
     
-    # Return response that triggers redirect to library
-    return HTMLResponse(
-        content="",
-        headers={"HX-Redirect": "/library/ui"}
-    )
+    # Bodiless response; htmx follows HX-Redirect before deciding whether to swap
+    return Response(status_code=204, headers={"HX-Redirect": "/library/ui"})
 
 
 def _render_cover_section(request: Request, book: Book) -> HTMLResponse:
     """Render the cover image display section only."""
-    return templates.TemplateResponse("_cover_section.html", {
-        "request": request,
-        "book": book,
-    })
+    if not book.cover_image_url:
+        return HTMLResponse(content=_no_cover_section_html())
+    return HTMLResponse(content=_cover_section_macro()(book, init_icons=True))
+
+
+def _cover_section_macro():
+    """Return the cover_section macro.
+
+    Jinja keeps the compiled macro module on the cached template, so this is a
+    dict lookup unless auto_reload finds the file changed on disk.
+    """
+    return templates.get_template("_macros/cover.html").module.cover_section
+
+
+def _cache_rendered(fn):
+    """Memoize a fragment renderer in production; in development templates reload, so render every time."""
+    return functools.lru_cache(maxsize=512)(fn) if TEMPLATE_CACHE_ENABLED else fn
+
+
+@_cache_rendered
+def _no_cover_section_html() -> str:
+    """Render the "No cover" placeholder, which does not depend on the book."""
+    return str(_cover_section_macro()({"cover_image_url": None}, init_icons=True))
+
+
+def _commit_and_render_cover(session: Session, request: Request, book: Book) -> HTMLResponse:
+    """Save the book's cover change and return the updated cover section."""
+    # Render from the values just set; committing first would expire them and re-SELECT the row
+    response = _render_cover_section(request, book)
+    session.add(book)
+    session.commit()
+    return response
 
 
 def _render_cover_search_results(request: Request, book_id: int, results: list[dict], query: str) -> HTMLResponse:
     """Render Open Library cover search results list."""
-    return templates.TemplateResponse("_cover_search_results.html", {
-        "request": request,
-        "book_id": book_id,
-        "results": results,
-        "query": query,
-    })
+    result_key = tuple((r["cover_id"], r["title"], r["author"], r["year"]) for r in results)
+    return HTMLResponse(content=_cover_search_results_html(book_id, query, result_key))
+
+
+@_cache_rendered
+def _cover_search_results_html(book_id: int, query: str, result_key: tuple) -> str:
+    """Render cover search results; in production cached on the (book, query, results) content."""
+    results = [
+        {"cover_id": cover_id, "title": title, "author": author, "year": year}
+        for cover_id, title, author, year in result_key
+    ]
+    return templates.get_template("_cover_search_results.html").render(
+        book_id=book_id, results=results, query=query
+    )
 
 
 def _render_tags_section(request: Request, book: Book) -> HTMLResponse:
     """Render the document tags section."""
-    return templates.TemplateResponse("_tags_section.html", {
-        "request": request,
-        "book": book,
-    })
+    return HTMLResponse(content=_tags_section_html(book.id, book.document_tags))
+
+
+@_cache_rendered
+def _tags_section_html(book_id: int, document_tags: Optional[str]) -> str:
+    """Render the tags section; in production cached on (book_id, document_tags) so unchanged tags skip rendering."""
+    return templates.get_template("_tags_section.html").render(
+        book={"id": book_id, "document_tags": document_tags}
+    )
+
+
+async def _fs(fn, *args, **kwargs):
+    """Run a blocking filesystem call in a worker thread to keep the event loop free."""
+    return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+async def _search_openlibrary(search_query: str) -> list[dict]:
+    """Query Open Library and keep only the fields the results template renders."""
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        response = await client.get(
+            "https://openlibrary.org/search.json",
+            params={"q": search_query, "limit": 8}
+        )
+        response.raise_for_status()
+        data = response.json()
+
+    results: list[dict] = []
+    for doc in data.get("docs", []):
+        cover_id = doc.get("cover_i")
+        if not cover_id:
+            continue
+        title = doc.get("title") or "Untitled"
+        author_list = doc.get("author_name") or []
+        author = author_list[0] if author_list else "Unknown"
+        year = doc.get("first_publish_year")
+        results.append({
+            "cover_id": cover_id,
+            "title": title,
+            "author": author,
+            "year": year
+        })
+    return results
+
+
+def _search_cache_get(key: str) -> Optional[list[dict]]:
+    """Return cached search results for a normalized query, or None if missing/expired."""
+    entry = _search_cache.get(key)
+    if entry is None:
+        return None
+    stored_at, results = entry
+    if time.monotonic() - stored_at > SEARCH_CACHE_TTL_SECONDS:
+        del _search_cache[key]
+        return None
+    _search_cache.move_to_end(key)
+    return results
+
+
+def _search_cache_put(key: str, results: list[dict]) -> None:
+    """Store search results, evicting the least recently used entries beyond the size cap."""
+    _search_cache[key] = (time.monotonic(), results)
+    _search_cache.move_to_end(key)
+    while len(_search_cache) > SEARCH_CACHE_MAX_ENTRIES:
+        _search_cache.popitem(last=False)
+
+
+def _remove_file(file_path: str) -> None:
+    """Delete a file with a single unlink, ignoring it if it is already gone."""
+    try:
+        os.unlink(file_path)
+    except OSError:
+        pass
 
 
 def _delete_existing_cover_file(book: Book) -> None:
@@ -539,18 +621,27 @@ def _delete_existing_cover_file(book: Book) -> None:
         return
 
     filename = book.cover_image_url.split("/")[-1]
-    file_path = os.path.join(COVER_UPLOAD_DIR, filename)
-    try:
-        if os.path.exists(file_path):
-            os.remove(file_path)
-    except OSError:
-        pass
+    _remove_file(os.path.join(COVER_UPLOAD_DIR, filename))
+
+
+def _highlight_counts(session: Session, book_id: int) -> tuple[int, int]:
+    """Return (active, discarded) highlight counts for a book in one grouped query."""
+    counts_stmt = (
+        select(Highlight.is_discarded, func.count())
+        .where(Highlight.book_id == book_id)
+        .group_by(Highlight.is_discarded)
+    )
+    counts = dict(session.exec(counts_stmt).all())
+    return counts.get(False, 0), counts.get(True, 0)
 
 
-def _render_book_header(request: Request, book: Book, highlight_count: int) -> HTMLResponse:
-    """Render the book header section."""
+def _render_book_header(request: Request, book: Book, counts: tuple[int, int]) -> HTMLResponse:
+    """Render the book header section from (active, discarded) highlight counts."""
+    active_count, discarded_count = counts
     return templates.TemplateResponse("_book_header.html", {
         "request": request,
         "book": book,
-        "highlight_count": highlight_count,
+        "active_count": active_count,
+        "discarded_count": discarded_count,
+        "highlight_count": active_count + discarded_count,
     })
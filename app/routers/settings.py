@@ -1,15 +1,17 @@
 from typing import Optional
 from fastapi import APIRouter, Depends, Request, Form
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from sqlmodel import Session, select, func
+from sqlmodel import Session
 
-from app.db import get_session, get_settings
-from app.models import Settings, Highlight
+from app.db import (
+    get_session, get_settings, load_settings, get_highlight_count,
+    invalidate_highlight_count, invalidate_settings,
+)
+from app.models import Settings
+from app.templating import templates
 
 
 router = APIRouter(prefix="/settings", tags=["settings"])
-templates = Jinja2Templates(directory="app/templates")
 
 
 # ============ HTML/HTMX Endpoints ============
@@ -21,8 +23,7 @@ async def ui_settings(
 ):
     """Render settings page with form."""
     settings = get_settings(session)
-    highlights_count_stmt = select(func.count(Highlight.id))
-    highlights_count = session.exec(highlights_count_stmt).one()
+    highlights_count = get_highlight_count(session)
     return templates.TemplateResponse("settings.html", {
         "request": request,
         "settings": settings,
@@ -39,7 +40,7 @@ async def update_settings_ui(
     session: Session = Depends(get_session)
 ):
     """Update settings from form submission."""
-    settings = get_settings(session)
+    settings = load_settings(session)
     
     settings.daily_review_count = max(1, min(15, daily_review_count))
     settings.highlight_recency = max(0, min(10, highlight_recency))
@@ -49,9 +50,8 @@ async def update_settings_ui(
     session.commit()
     session.refresh(settings)
     
-    highlights_count_stmt = select(func.count(Highlight.id))
-    highlights_count = session.exec(highlights_count_stmt).one()
-    
+    highlights_count = get_highlight_count(session)
+
     # Return updated form with success message
     return templates.TemplateResponse("settings.html", {
         "request": request,
@@ -70,6 +70,8 @@ async def reset_library(request: Request):
     engine = get_engine()
     SQLModel.metadata.drop_all(engine)
     SQLModel.metadata.create_all(engine)
+    invalidate_highlight_count()
+    invalidate_settings()
 
     with Session(engine) as s:
         fresh_settings = get_settings(s)
@@ -0,0 +1,29 @@
+"""
+Shared Jinja2 template environment for all routers.
+
+In production (FREEWISE_ENV=production) templates are never re-checked for
+changes on disk and compiled bytecode is cached on the filesystem, so each
+template is parsed at most once per deployment instead of once per process.
+TEMPLATE_CACHE_ENABLED tells routers whether rendered fragments may be cached
+as well; in development templates reload from disk, so they must not be.
+"""
+import os
+import tempfile
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
+
+TEMPLATE_DIR = "app/templates"
+
+TEMPLATE_CACHE_ENABLED = os.getenv("FREEWISE_ENV") == "production"
+
+templates = Jinja2Templates(directory=TEMPLATE_DIR)
+
+if TEMPLATE_CACHE_ENABLED:
+    _cache_dir = os.getenv(
+        "FREEWISE_JINJA_CACHE_DIR",
+        os.path.join(tempfile.gettempdir(), "freewise_jinja_cache"),
+    )
+    os.makedirs(_cache_dir, exist_ok=True)
+    templates.env.auto_reload = False
+    templates.env.bytecode_cache = FileSystemBytecodeCache(_cache_dir)
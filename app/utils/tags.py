@@ -1,39 +1,43 @@
 """
 Utility functions for parsing and formatting tags.
 """
-from typing import List
+from functools import lru_cache
+from typing import Iterable, Tuple
 
 
-def parse_tags(tags_str: str) -> List[str]:
+@lru_cache(maxsize=1024)
+def parse_tags(tags_str: str) -> Tuple[str, ...]:
     """
-    Parse a comma-separated string of tags into a list.
+    Parse a comma-separated string of tags into a tuple.
+    
+    Results are memoised, so the return value is an immutable tuple.
     
     Args:
         tags_str: Comma-separated tag string (e.g., "python, fastapi, web")
     
     Returns:
-        List of cleaned tag strings with whitespace removed
+        Tuple of cleaned tag strings with whitespace removed
     
     Examples:
         >>> parse_tags("python, fastapi, web")
-        ['python', 'fastapi', 'web']
+        ('python', 'fastapi', 'web')
         >>> parse_tags("")
-        []
+        ()
         >>> parse_tags("  tag1  ,  tag2  ")
-        ['tag1', 'tag2']
+        ('tag1', 'tag2')
     """
     if not tags_str or not tags_str.strip():
-        return []
+        return ()
     
-    return [tag.strip() for tag in tags_str.split(',') if tag.strip()]
+    return tuple(tag.strip() for tag in tags_str.split(',') if tag.strip())
 
 
-def join_tags(tags_list: List[str]) -> str:
+def join_tags(tags_list: Iterable[str]) -> str:
     """
     Join a list of tags into a comma-separated string.
     
     Args:
-        tags_list: List of tag strings
+        tags_list: List (or any iterable) of tag strings
     
     Returns:
         Comma-separated string of tags
@@ -46,7 +50,13 @@ def join_tags(tags_list: List[str]) -> str:
         >>> join_tags(['single'])
         'single'
     """
-    if not tags_list:
+    return _join_tags(tuple(tags_list))
+
+
+@lru_cache(maxsize=1024)
+def _join_tags(tags: Tuple[str, ...]) -> str:
+    """Memoised implementation of join_tags keyed on the tag tuple."""
+    if not tags:
         return ""
     
-    return ", ".join(tag.strip() for tag in tags_list if tag.strip())
+    return ", ".join(tag.strip() for tag in tags if tag.strip())
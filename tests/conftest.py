@@ -1,7 +1,8 @@
 """
 Shared pytest fixtures for the FreeWise test suite.
 
-Provides an isolated in-memory SQLite database, a seeded FastAPI TestClient,
+Provides an in-memory SQLite database (schema built once, tables emptied
+between tests), a seeded FastAPI TestClient, an in-process httpx AsyncClient,
 and convenience factories for creating test data.
 """
 import sys
@@ -9,7 +10,9 @@ from pathlib import Path
 from datetime import datetime, date, timedelta
 
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
 from sqlmodel import create_engine, Session, SQLModel, select
 from sqlalchemy.pool import StaticPool
 
@@ -44,15 +47,53 @@ app.dependency_overrides[_db.get_session] = _override_get_session
 
 # ── Fixtures ──────────────────────────────────────────────────────────────────
 
-@pytest.fixture(autouse=True)
-def _reset_db():
-    """Drop and recreate all tables before every test for full isolation."""
-    SQLModel.metadata.drop_all(_test_engine)
+@pytest.fixture(scope="session")
+def _schema():
+    """Create the schema once for the whole test session and release the pool at the end."""
     SQLModel.metadata.create_all(_test_engine)
+    yield
+    SQLModel.metadata.drop_all(_test_engine)
+    _test_engine.dispose()
+
+
+SEED_USER_ID = 1
+
+
+def _insert_seed_user():
+    with Session(_test_engine) as s:
+        s.add(User(id=SEED_USER_ID, email="test@test.com", password_hash="x"))
+        s.commit()
+
+
+@pytest.fixture(scope="session")
+def seed_user(_schema):
+    """Insert the test user once for the whole session and return its id."""
+    _insert_seed_user()
+    return SEED_USER_ID
+
+
+@pytest.fixture()
+def reseed_user(seed_user):
+    """Restore the session's test user after a test that drops every table."""
+    yield seed_user
+    _insert_seed_user()
+
+
+@pytest.fixture(autouse=True)
+def _reset_db(seed_user):
+    """Empty every table except the seeded user before each test for full isolation.
+
+    Row deletes are much cheaper than rebuilding the schema. The app commits
+    through its own sessions, so per-test transaction rollback is not an option.
+    """
+    with _test_engine.begin() as conn:
+        for table in reversed(SQLModel.metadata.sorted_tables):
+            if table is not User.__table__:
+                conn.execute(table.delete())
+    _db.invalidate_highlight_count()
+    _db.invalidate_settings()
 
-    # Seed minimal required data
     with Session(_test_engine) as s:
-        s.add(User(id=1, email="test@test.com", password_hash="x"))
         s.add(Settings(daily_review_count=5, highlight_recency=5, theme="light"))
         s.commit()
 
@@ -62,6 +103,9 @@ def _reset_db():
     from app.routers.highlights import review_sessions
     review_sessions.clear()
 
+    from app.routers.library import _search_cache
+    _search_cache.clear()
+
 
 @pytest.fixture()
 def db():
@@ -70,13 +114,31 @@ def db():
         yield session
 
 
-@pytest.fixture()
-def client():
-    """Yield a FastAPI TestClient with the lifespan context active."""
+@pytest.fixture(scope="session")
+def _app_client(_schema):
+    """Run the app lifespan once and share one TestClient across the session."""
     with TestClient(app) as c:
         yield c
 
 
+@pytest.fixture()
+def client(_app_client):
+    """Yield the shared FastAPI TestClient with cookies from earlier tests cleared."""
+    _app_client.cookies.clear()
+    yield _app_client
+
+
+@pytest_asyncio.fixture()
+async def async_client():
+    """Yield an httpx AsyncClient that calls the app in-process over ASGI.
+
+    Skips TestClient's thread portal; the lifespan is not run, which the
+    tests do not need since the schema and settings are seeded above.
+    """
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        yield c
+
+
 # ── Factory helpers ───────────────────────────────────────────────────────────
 
 @pytest.fixture()
@@ -94,16 +156,16 @@ def make_book(db):
 
 
 @pytest.fixture()
-def make_highlight(db, make_book):
+def make_highlight(db, make_book, seed_user):
     """Factory fixture: create a Highlight (auto-creates a book if needed)."""
 
     _default_book = None
 
-    def _make(
+    def _build(
         text="A test highlight",
         book=None,
         book_id=None,
-        user_id=1,
+        user_id=seed_user,
         highlight_weight=1.0,
         is_favorited=False,
         is_discarded=False,
@@ -123,7 +185,7 @@ def make_highlight(db, make_book):
         elif book is not None:
             book_id = book.id
 
-        h = Highlight(
+        return Highlight(
             text=text,
             book_id=book_id,
             user_id=user_id,
@@ -138,21 +200,41 @@ def make_highlight(db, make_book):
             location_type=location_type,
             **kw,
         )
+
+    def _make(text="A test highlight", **kw):
+        h = _build(text, **kw)
         db.add(h)
         db.commit()
         db.refresh(h)
         return h
 
+    _make.build = _build
+    return _make
+
+
+@pytest.fixture()
+def make_highlights(db, make_highlight):
+    """Factory fixture: create one Highlight per text in a single commit.
+
+    Keyword arguments are shared by every highlight, as for make_highlight.
+    """
+
+    def _make(texts, **kw):
+        highlights = [make_highlight.build(text, **kw) for text in texts]
+        db.add_all(highlights)
+        db.commit()
+        return highlights
+
     return _make
 
 
 @pytest.fixture()
-def make_review_session(db):
+def make_review_session(db, seed_user):
     """Factory fixture: create a ReviewSession record."""
 
     def _make(
         session_uuid=None,
-        user_id=1,
+        user_id=seed_user,
         started_at=None,
         completed_at=None,
         session_date=None,
@@ -1,11 +1,17 @@
 """
-Tests for database utility functions: get_settings, get_current_streak.
+Tests for database utility functions: get_settings, get_current_streak,
+calculate_streaks, get_highlight_count.
 """
 from datetime import date, timedelta, datetime
+import pytest
 from sqlmodel import Session, select
 
-from app.db import get_settings, get_current_streak
-from app.models import Settings, ReviewSession
+from app import db as _db
+from app.db import (
+    get_settings, load_settings, get_current_streak, get_highlight_count,
+    calculate_streaks, current_streak,
+)
+from app.models import Settings, ReviewSession, Highlight
 
 
 class TestGetSettings:
@@ -37,6 +43,24 @@ class TestGetSettings:
         assert isinstance(settings.highlight_recency, int)
         assert settings.highlight_recency == 5
 
+    def test_served_from_cache(self, db, monkeypatch):
+        get_settings(db)
+        monkeypatch.setattr(_db, "load_settings", lambda session: pytest.fail("cache miss"))
+        assert get_settings(db).daily_review_count == 5
+
+    def test_returns_detached_copy(self, db):
+        settings = get_settings(db)
+        settings.theme = "dark"
+        assert get_settings(db).theme == "light"
+
+    def test_update_invalidates_cache(self, db):
+        assert get_settings(db).theme == "light"
+        row = load_settings(db)
+        row.theme = "dark"
+        db.add(row)
+        db.commit()
+        assert get_settings(db).theme == "dark"
+
 
 class TestGetCurrentStreak:
     """get_current_streak() counts consecutive review days."""
@@ -80,3 +104,86 @@ class TestGetCurrentStreak:
         make_review_session(session_date=today)  # duplicate day
         make_review_session(session_date=today - timedelta(days=1))
         assert get_current_streak(db) == 2
+
+
+STREAK_TODAY = date(2025, 6, 15)
+
+
+def _days_before(*offsets):
+    return tuple(STREAK_TODAY - timedelta(days=i) for i in offsets)
+
+
+# Review dates -> (current, longest), built once at import time
+STREAK_CASES = [
+    pytest.param((), (0, 0), id="empty"),
+    pytest.param(_days_before(0, 1, 2), (3, 3), id="current_is_longest"),
+    pytest.param(_days_before(0, 10, 11, 12, 13), (1, 4), id="longest_in_the_past"),
+    pytest.param(_days_before(2, 3), (0, 2), id="inactive_user"),
+    pytest.param(_days_before(1, 0, 1, 2, 0), (3, 3), id="unsorted_duplicates"),
+]
+
+
+class TestCalculateStreaks:
+    """calculate_streaks() returns (current, longest); current_streak() agrees on current."""
+
+    @pytest.mark.parametrize("dates,expected", STREAK_CASES)
+    def test_streaks(self, dates, expected):
+        assert calculate_streaks(dates, today=STREAK_TODAY) == expected
+
+    @pytest.mark.parametrize("dates,expected", STREAK_CASES)
+    def test_current_streak_matches(self, dates, expected):
+        newest_first = sorted(set(dates), reverse=True)
+        assert current_streak(newest_first, today=STREAK_TODAY) == expected[0]
+
+
+class TestGetHighlightCount:
+    """get_highlight_count() caches the total and invalidates it on insert/delete."""
+
+    def test_counts_highlights(self, db, make_highlight):
+        make_highlight(text="H1")
+        make_highlight(text="H2")
+        assert get_highlight_count(db) == 2
+
+    def test_insert_invalidates_cache(self, db, make_highlight):
+        make_highlight(text="H1")
+        assert get_highlight_count(db) == 1
+        make_highlight(text="H2")
+        assert get_highlight_count(db) == 2
+
+    def test_delete_invalidates_cache(self, db, make_highlight):
+        h = make_highlight(text="H1")
+        make_highlight(text="H2")
+        assert get_highlight_count(db) == 2
+        db.delete(h)
+        db.commit()
+        assert get_highlight_count(db) == 1
+
+    def test_expires_after_ttl(self, db, make_highlight, monkeypatch):
+        make_highlight(text="H1")
+        assert get_highlight_count(db) == 1
+        # A row written by another process fires no ORM event here
+        db.connection().execute(Highlight.__table__.insert().values(
+            text="H2", user_id=1, created_at=datetime(2025, 6, 1),
+        ))
+        db.commit()
+        assert get_highlight_count(db) == 1
+
+        now = _db.time.monotonic()
+        monkeypatch.setattr(_db.time, "monotonic", lambda: now + _db.CACHE_TTL_SECONDS + 1)
+        assert get_highlight_count(db) == 2
+
+
+class TestSqlitePragmas:
+    """_configure_sqlite() switches file databases to WAL and keeps full sync."""
+
+    def test_wal_keeps_full_sync(self, tmp_path):
+        import sqlite3
+        from app.db import _configure_sqlite
+
+        conn = sqlite3.connect(tmp_path / "pragmas.db")
+        try:
+            _configure_sqlite(conn, None)
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2  # FULL
+        finally:
+            conn.close()
@@ -5,19 +5,22 @@ Covers: CRUD, favorite toggle, discard toggle, weight update,
 edit form save, and review flow.
 """
 from datetime import datetime, date
+import pytest
 from sqlmodel import select
 
 from app.models import Highlight, ReviewSession
 
+pytestmark = pytest.mark.asyncio
+
 
 # ── JSON API endpoints ────────────────────────────────────────────────────────
 
 class TestHighlightCRUD:
     """JSON CRUD operations on /highlights/."""
 
-    def test_create_highlight(self, client, db, make_book):
+    async def test_create_highlight(self, async_client, db, make_book):
         book = make_book()
-        resp = client.post("/highlights/", json={
+        resp = await async_client.post("/highlights/", json={
             "text": "New highlight",
             "user_id": 1,
         })
@@ -26,76 +29,76 @@ class TestHighlightCRUD:
         assert data["text"] == "New highlight"
         assert data["id"] is not None
 
-    def test_get_highlight(self, client, make_highlight):
+    async def test_get_highlight(self, async_client, make_highlight):
         h = make_highlight(text="Fetch me")
-        resp = client.get(f"/highlights/{h.id}")
+        resp = await async_client.get(f"/highlights/{h.id}")
         assert resp.status_code == 200
         assert resp.json()["text"] == "Fetch me"
 
-    def test_get_highlight_not_found(self, client):
-        resp = client.get("/highlights/99999")
+    async def test_get_highlight_not_found(self, async_client):
+        resp = await async_client.get("/highlights/99999")
         assert resp.status_code == 404
 
-    def test_update_highlight(self, client, make_highlight):
+    async def test_update_highlight(self, async_client, make_highlight):
         h = make_highlight(text="Original")
-        resp = client.put(f"/highlights/{h.id}", json={"text": "Updated"})
+        resp = await async_client.put(f"/highlights/{h.id}", json={"text": "Updated"})
         assert resp.status_code == 200
         assert resp.json()["text"] == "Updated"
 
-    def test_list_highlights(self, client, make_highlight):
+    async def test_list_highlights(self, async_client, make_highlight):
         make_highlight(text="HL1")
         make_highlight(text="HL2")
-        resp = client.get("/highlights/")
+        resp = await async_client.get("/highlights/")
         assert resp.status_code == 200
         assert len(resp.json()) == 2
 
-    def test_list_active_only(self, client, make_highlight):
+    async def test_list_active_only(self, async_client, make_highlight):
         make_highlight(text="Active", is_discarded=False)
         make_highlight(text="Discarded", is_discarded=True)
-        resp = client.get("/highlights/", params={"status": "active"})
+        resp = await async_client.get("/highlights/", params={"status": "active"})
         items = resp.json()
         assert len(items) == 1
         assert items[0]["text"] == "Active"
 
-    def test_list_discarded_only(self, client, make_highlight):
+    async def test_list_discarded_only(self, async_client, make_highlight):
         make_highlight(text="Active", is_discarded=False)
         make_highlight(text="Discarded", is_discarded=True)
-        resp = client.get("/highlights/", params={"status": "discarded"})
+        resp = await async_client.get("/highlights/", params={"status": "discarded"})
         items = resp.json()
         assert len(items) == 1
         assert items[0]["text"] == "Discarded"
 
-    def test_list_with_limit(self, client, make_highlight):
+    async def test_list_with_limit(self, async_client, make_highlight):
         for i in range(5):
             make_highlight(text=f"HL {i}")
-        resp = client.get("/highlights/", params={"limit": 2})
+        resp = await async_client.get("/highlights/", params={"limit": 2})
         assert len(resp.json()) == 2
 
 
 class TestFavoriteToggle:
     """POST /highlights/{id}/favorite/json — toggle favorite."""
 
-    def test_favorite_on(self, client, make_highlight):
+    async def test_favorite_on(self, async_client, make_highlight):
         h = make_highlight()
-        resp = client.post(f"/highlights/{h.id}/favorite/json",
+        resp = await async_client.post(f"/highlights/{h.id}/favorite/json",
                            json={"favorite": True})
         assert resp.status_code == 200
         assert resp.json()["is_favorited"] is True
 
-    def test_favorite_off(self, client, make_highlight):
+    async def test_favorite_off(self, async_client, make_highlight):
         h = make_highlight(is_favorited=True)
-        resp = client.post(f"/highlights/{h.id}/favorite/json",
+        resp = await async_client.post(f"/highlights/{h.id}/favorite/json",
                            json={"favorite": False})
         assert resp.status_code == 200
         assert resp.json()["is_favorited"] is False
 
-    def test_cannot_favorite_discarded(self, client, make_highlight):
+    async def test_cannot_favorite_discarded(self, async_client, make_highlight):
         h = make_highlight(is_discarded=True)
-        resp = client.post(f"/highlights/{h.id}/favorite/json",
+        resp = await async_client.post(f"/highlights/{h.id}/favorite/json",
                            json={"favorite": True})
         assert resp.status_code == 400
 
-    def test_unfavorite_discarded_ok(self, client, make_highlight, db):
+    async def test_unfavorite_discarded_ok(self, async_client, make_highlight, db):
         """Unfavoriting a discarded highlight should still work."""
         h = make_highlight(is_discarded=True, is_favorited=True)
         # Force the state in DB (normally impossible via app logic)
@@ -104,7 +107,7 @@ class TestFavoriteToggle:
         db.add(h_db)
         db.commit()
 
-        resp = client.post(f"/highlights/{h.id}/favorite/json",
+        resp = await async_client.post(f"/highlights/{h.id}/favorite/json",
                            json={"favorite": False})
         assert resp.status_code == 200
 
@@ -112,15 +115,15 @@ class TestFavoriteToggle:
 class TestDiscardJSON:
     """POST /highlights/{id}/discard/json — mark as discarded."""
 
-    def test_discard(self, client, make_highlight):
+    async def test_discard(self, async_client, make_highlight):
         h = make_highlight()
-        resp = client.post(f"/highlights/{h.id}/discard/json")
+        resp = await async_client.post(f"/highlights/{h.id}/discard/json")
         assert resp.status_code == 200
         assert resp.json()["is_discarded"] is True
 
-    def test_discard_auto_unfavorites(self, client, make_highlight):
+    async def test_discard_auto_unfavorites(self, async_client, make_highlight):
         h = make_highlight(is_favorited=True)
-        resp = client.post(f"/highlights/{h.id}/discard/json")
+        resp = await async_client.post(f"/highlights/{h.id}/discard/json")
         data = resp.json()
         assert data["is_discarded"] is True
         assert data["is_favorited"] is False
@@ -131,35 +134,35 @@ class TestDiscardJSON:
 class TestHighlightEdit:
     """POST /highlights/{id}/edit — save edited highlight text/note/weight."""
 
-    def test_edit_text(self, client, make_highlight):
+    async def test_edit_text(self, async_client, make_highlight):
         h = make_highlight(text="Before")
-        resp = client.post(f"/highlights/{h.id}/edit",
+        resp = await async_client.post(f"/highlights/{h.id}/edit",
                            data={"text": "After", "context": ""})
         assert resp.status_code == 200
         assert "After" in resp.text
 
-    def test_edit_note(self, client, make_highlight, db):
+    async def test_edit_note(self, async_client, make_highlight, db):
         h = make_highlight(text="HL", note=None)
-        client.post(f"/highlights/{h.id}/edit",
+        await async_client.post(f"/highlights/{h.id}/edit",
                      data={"text": "HL", "note": "My note", "context": ""})
         db.refresh(h)
         assert h.note == "My note"
 
-    def test_edit_weight_clamped(self, client, make_highlight, db):
+    async def test_edit_weight_clamped(self, async_client, make_highlight, db):
         h = make_highlight()
-        client.post(f"/highlights/{h.id}/edit",
+        await async_client.post(f"/highlights/{h.id}/edit",
                      data={"text": h.text, "highlight_weight": "5.0", "context": ""})
         db.refresh(h)
         assert h.highlight_weight == 2.0
 
-        client.post(f"/highlights/{h.id}/edit",
+        await async_client.post(f"/highlights/{h.id}/edit",
                      data={"text": h.text, "highlight_weight": "-1.0", "context": ""})
         db.refresh(h)
         assert h.highlight_weight == 0.0
 
-    def test_edit_preserves_weight_when_absent(self, client, make_highlight, db):
+    async def test_edit_preserves_weight_when_absent(self, async_client, make_highlight, db):
         h = make_highlight(highlight_weight=1.5)
-        client.post(f"/highlights/{h.id}/edit",
+        await async_client.post(f"/highlights/{h.id}/edit",
                      data={"text": h.text, "context": ""})
         db.refresh(h)
         assert h.highlight_weight == 1.5
@@ -168,24 +171,24 @@ class TestHighlightEdit:
 class TestWeightEndpoint:
     """POST /highlights/{id}/weight — quick weight update."""
 
-    def test_set_weight(self, client, make_highlight, db):
+    async def test_set_weight(self, async_client, make_highlight, db):
         h = make_highlight()
-        resp = client.post(f"/highlights/{h.id}/weight",
+        resp = await async_client.post(f"/highlights/{h.id}/weight",
                            data={"weight": "1.5", "context": ""})
         assert resp.status_code == 200
         db.refresh(h)
         assert h.highlight_weight == 1.5
 
-    def test_weight_clamped_high(self, client, make_highlight, db):
+    async def test_weight_clamped_high(self, async_client, make_highlight, db):
         h = make_highlight()
-        client.post(f"/highlights/{h.id}/weight",
+        await async_client.post(f"/highlights/{h.id}/weight",
                      data={"weight": "10.0", "context": ""})
         db.refresh(h)
         assert h.highlight_weight == 2.0
 
-    def test_weight_clamped_low(self, client, make_highlight, db):
+    async def test_weight_clamped_low(self, async_client, make_highlight, db):
         h = make_highlight()
-        client.post(f"/highlights/{h.id}/weight",
+        await async_client.post(f"/highlights/{h.id}/weight",
                      data={"weight": "-5.0", "context": ""})
         db.refresh(h)
         assert h.highlight_weight == 0.0
@@ -194,17 +197,17 @@ class TestWeightEndpoint:
 class TestFavoriteHTML:
     """POST /highlights/{id}/favorite — HTML toggle."""
 
-    def test_favorite_toggle_html(self, client, make_highlight, db):
+    async def test_favorite_toggle_html(self, async_client, make_highlight, db):
         h = make_highlight()
-        resp = client.post(f"/highlights/{h.id}/favorite",
+        resp = await async_client.post(f"/highlights/{h.id}/favorite",
                            data={"favorite": "true", "context": ""})
         assert resp.status_code == 200
         db.refresh(h)
         assert h.is_favorited is True
 
-    def test_cannot_favorite_discarded_html(self, client, make_highlight):
+    async def test_cannot_favorite_discarded_html(self, async_client, make_highlight):
         h = make_highlight(is_discarded=True)
-        resp = client.post(f"/highlights/{h.id}/favorite",
+        resp = await async_client.post(f"/highlights/{h.id}/favorite",
                            data={"favorite": "true", "context": ""})
         assert resp.status_code == 400
 
@@ -212,24 +215,24 @@ class TestFavoriteHTML:
 class TestDiscardHTML:
     """POST /highlights/{id}/discard — HTML toggle."""
 
-    def test_discard_toggle_html(self, client, make_highlight, db):
+    async def test_discard_toggle_html(self, async_client, make_highlight, db):
         h = make_highlight()
-        resp = client.post(f"/highlights/{h.id}/discard",
+        resp = await async_client.post(f"/highlights/{h.id}/discard",
                            data={"context": ""})
         assert resp.status_code == 200
         db.refresh(h)
         assert h.is_discarded is True
 
-    def test_discard_auto_unfavorites_html(self, client, make_highlight, db):
+    async def test_discard_auto_unfavorites_html(self, async_client, make_highlight, db):
         h = make_highlight(is_favorited=True)
-        client.post(f"/highlights/{h.id}/discard", data={"context": ""})
+        await async_client.post(f"/highlights/{h.id}/discard", data={"context": ""})
         db.refresh(h)
         assert h.is_discarded is True
         assert h.is_favorited is False
 
-    def test_restore_from_discarded(self, client, make_highlight, db):
+    async def test_restore_from_discarded(self, async_client, make_highlight, db):
         h = make_highlight(is_discarded=True)
-        client.post(f"/highlights/{h.id}/discard", data={"context": ""})
+        await async_client.post(f"/highlights/{h.id}/discard", data={"context": ""})
         db.refresh(h)
         assert h.is_discarded is False
 
@@ -237,10 +240,10 @@ class TestDiscardHTML:
 class TestFavoritesPage:
     """GET /highlights/ui/favorites — favorites listing."""
 
-    def test_favorites_page(self, client, make_highlight):
+    async def test_favorites_page(self, async_client, make_highlight):
         make_highlight(text="Faved", is_favorited=True)
         make_highlight(text="Normal", is_favorited=False)
-        resp = client.get("/highlights/ui/favorites")
+        resp = await async_client.get("/highlights/ui/favorites")
         assert resp.status_code == 200
         assert "Faved" in resp.text
         assert "Normal" not in resp.text
@@ -249,10 +252,10 @@ class TestFavoritesPage:
 class TestDiscardedPage:
     """GET /highlights/ui/discarded — discarded listing."""
 
-    def test_discarded_page(self, client, make_highlight):
+    async def test_discarded_page(self, async_client, make_highlight):
         make_highlight(text="Disc", is_discarded=True)
         make_highlight(text="Active", is_discarded=False)
-        resp = client.get("/highlights/ui/discarded")
+        resp = await async_client.get("/highlights/ui/discarded")
         assert resp.status_code == 200
         assert "Disc" in resp.text
         assert "Active" not in resp.text
@@ -8,7 +8,8 @@ import io
 import csv
 from datetime import datetime
 
-from sqlmodel import select
+import pytest
+from sqlmodel import select, func
 
 from app.models import Highlight, Book, Tag, HighlightTag
 from app.routers.importer import parse_readwise_datetime
@@ -106,8 +107,7 @@ class TestReadwiseImport:
             data={"diagnostic": "true"},
         )
         assert resp.status_code == 200
-        highlights = db.exec(select(Highlight)).all()
-        assert len(highlights) == 1
+        assert db.exec(select(func.count()).select_from(Highlight)).one() == 1
 
     def test_skip_empty_highlight(self, client, db):
         csv_file = _make_readwise_csv([
@@ -120,8 +120,7 @@ class TestReadwiseImport:
             data={"diagnostic": "true"},
         )
         assert resp.status_code == 200
-        highlights = db.exec(select(Highlight)).all()
-        assert len(highlights) == 1
+        assert db.exec(select(func.count()).select_from(Highlight)).one() == 1
 
     def test_skip_header_marker_notes(self, client, db):
         csv_file = _make_readwise_csv([
@@ -134,8 +133,7 @@ class TestReadwiseImport:
             data={"diagnostic": "true"},
         )
         assert resp.status_code == 200
-        highlights = db.exec(select(Highlight)).all()
-        assert len(highlights) == 0
+        assert db.exec(select(func.count()).select_from(Highlight)).one() == 0
 
     def test_tag_based_favorite(self, client, db):
         csv_file = _make_readwise_csv([{
@@ -253,20 +251,31 @@ class TestReadwiseImport:
 
 # ── CSV Export ────────────────────────────────────────────────────────────────
 
+@pytest.fixture()
+def export_csv(client):
+    """Fetch /export/csv and parse it once; returns (response, fieldnames, rows)."""
+
+    def _export():
+        resp = client.get("/export/csv")
+        reader = csv.DictReader(io.StringIO(resp.text))
+        rows = list(reader)
+        return resp, reader.fieldnames, rows
+
+    return _export
+
+
 class TestCSVExport:
     """GET /export/csv — exporting highlights as Readwise-compatible CSV."""
 
-    def test_export_basic(self, client, make_highlight, make_book, db):
+    def test_export_basic(self, export_csv, make_highlight, make_book):
         book = make_book(title="Export Book", author="Export Author")
         make_highlight(text="Exportable", book=book, is_favorited=True)
 
-        resp = client.get("/export/csv")
+        resp, _, rows = export_csv()
         assert resp.status_code == 200
         assert resp.headers["content-type"].startswith("text/csv")
         assert "attachment" in resp.headers.get("content-disposition", "")
 
-        reader = csv.DictReader(io.StringIO(resp.text))
-        rows = list(reader)
         assert len(rows) == 1
         assert rows[0]["Highlight"] == "Exportable"
         assert rows[0]["Book Title"] == "Export Book"
@@ -278,11 +287,9 @@ class TestCSVExport:
         resp = client.get("/export/csv")
         assert resp.status_code == 400
 
-    def test_export_has_all_headers(self, client, make_highlight):
+    def test_export_has_all_headers(self, export_csv, make_highlight):
         make_highlight(text="Header check")
-        resp = client.get("/export/csv")
-        reader = csv.DictReader(io.StringIO(resp.text))
-        headers = reader.fieldnames
+        _, headers, _ = export_csv()
         expected = [
             "Highlight", "Book Title", "Book Author", "Amazon Book ID",
             "Note", "Color", "Tags", "Location Type", "Location",
@@ -290,7 +297,7 @@ class TestCSVExport:
         ]
         assert headers == expected
 
-    def test_roundtrip_import_export(self, client, db):
+    def test_roundtrip_import_export(self, client, export_csv):
         """Import → export → re-import should produce the same data."""
         csv_file = _make_readwise_csv([{
             "Highlight": "Roundtrip",
@@ -307,11 +314,9 @@ class TestCSVExport:
             data={"diagnostic": "true"},
         )
 
-        resp = client.get("/export/csv")
+        resp, _, rows = export_csv()
         assert resp.status_code == 200
 
-        reader = csv.DictReader(io.StringIO(resp.text))
-        rows = list(reader)
         assert len(rows) == 1
         assert rows[0]["Highlight"] == "Roundtrip"
         assert rows[0]["Book Title"] == "RT Book"
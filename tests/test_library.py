@@ -59,6 +59,27 @@ class TestLibraryPage:
         assert resp.status_code == 200
         assert "Safe" in resp.text
 
+    def test_pagination(self, client, make_book):
+        for title in ("Alpha", "Beta", "Gamma"):
+            make_book(title=title)
+        first = client.get("/library/ui?sort=title&order=asc&page=0&page_size=2")
+        assert first.status_code == 200
+        assert "Alpha" in first.text and "Beta" in first.text
+        assert "Gamma" not in first.text
+        assert "collection of 3 books" in first.text
+        assert "page=1&page_size=2" in first.text
+        second = client.get("/library/ui?sort=title&order=asc&page=1&page_size=2")
+        assert "Gamma" in second.text
+        assert "Alpha" not in second.text
+        assert "page=0&page_size=2" in second.text
+        assert "page=2" not in second.text
+
+    def test_out_of_range_page_rejected(self, client):
+        resp = client.get("/library/ui?page=99999999999999999999")
+        assert resp.status_code == 422
+        assert client.get("/library/ui?page=-1").status_code == 422
+        assert client.get("/library/ui?page_size=0").status_code == 422
+
     def test_invalid_order_falls_back(self, client, make_book):
         make_book(title="Safe")
         resp = client.get("/library/ui?sort=title&order=INVALID")
@@ -78,6 +99,39 @@ class TestBookDetail:
         assert "My Book" in resp.text
         assert "Favourite line" in resp.text
 
+    def test_detail_splits_discarded(self, client, make_book, make_highlight):
+        book = make_book(title="Split Book")
+        make_highlight(text="Kept line", book=book, location=1, location_type="page")
+        make_highlight(text="Dropped line", book=book, is_discarded=True)
+        resp = client.get(f"/library/ui/book/{book.id}")
+        assert resp.status_code == 200
+        assert "(Page 1)" in resp.text
+        assert "Discarded Highlights (1)" in resp.text
+        assert resp.text.index("Kept line") < resp.text.index("Dropped line")
+
+    def test_detail_large_book(self, client, make_book, make_highlights):
+        book = make_book(title="Long Book")
+        make_highlights([f"Line number {i} " + "x" * 300 for i in range(60)], book=book)
+        resp = client.get(f"/library/ui/book/{book.id}")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/html")
+        assert "Line number 0 " in resp.text
+        assert "Line number 59 " in resp.text
+        assert resp.text.rstrip().endswith("</html>")
+
+    def test_detail_render_error_is_500(self, monkeypatch, make_book):
+        from fastapi.testclient import TestClient
+        from jinja2 import ChoiceLoader, DictLoader
+        from app.main import app
+        from app.templating import templates
+
+        book = make_book(title="Broken")
+        broken = DictLoader({"book_detail.html": "{{ book.title }}{{ undefined_helper() }}"})
+        monkeypatch.setattr(templates.env, "loader", ChoiceLoader([broken, templates.env.loader]))
+        with TestClient(app, raise_server_exceptions=False) as c:
+            resp = c.get(f"/library/ui/book/{book.id}")
+        assert resp.status_code == 500
+
     def test_detail_404(self, client):
         resp = client.get("/library/ui/book/9999")
         assert resp.status_code == 404
@@ -148,6 +202,16 @@ class TestBookEdit:
         assert resp.status_code == 200
         assert "My Book" in resp.text
 
+    def test_header_counts(self, client, make_book, make_highlight):
+        book = make_book(title="Counted")
+        make_highlight(text="A", book=book)
+        make_highlight(text="B", book=book)
+        make_highlight(text="C", book=book, is_discarded=True)
+        resp = client.get(f"/library/ui/book/{book.id}/cancel-edit")
+        assert '<span class="font-semibold">2</span> active highlights' in resp.text
+        assert '<span class="font-semibold">1</span> discarded' in resp.text
+        assert "all its 3 highlight(s)" in resp.text
+
 
 # ── Tags ──────────────────────────────────────────────────────────────────────
 
@@ -160,10 +224,18 @@ class TestBookTags:
             "new_tag": "fiction",
         })
         assert resp.status_code == 200
+        assert "fiction" in resp.text
         db.expire_all()
         updated = db.get(Book, book.id)
         assert "fiction" in updated.document_tags
 
+    def test_tags_section_escapes_markup(self, client, make_book):
+        book = make_book()
+        resp = client.post(f"/library/ui/book/{book.id}/add-tag", data={"new_tag": "<b>bold</b>"})
+        assert resp.status_code == 200
+        assert "&lt;b&gt;bold&lt;/b&gt;" in resp.text
+        assert "<b>bold</b>" not in resp.text
+
     def test_add_tag_dedup(self, client, db, make_book):
         book = make_book(document_tags="science")
         client.post(f"/library/ui/book/{book.id}/add-tag", data={"new_tag": "science"})
@@ -186,6 +258,13 @@ class TestBookTags:
         updated = db.get(Book, book.id)
         assert updated.document_tags == "original"
 
+    def test_add_tag_form(self, client, make_book):
+        book = make_book()
+        resp = client.get(f"/library/ui/book/{book.id}/add-tag")
+        assert resp.status_code == 200
+        assert f'hx-post="/library/ui/book/{book.id}/add-tag"' in resp.text
+        assert f'hx-get="/library/ui/book/{book.id}/cancel-add-tag"' in resp.text
+
     def test_remove_tag(self, client, db, make_book):
         book = make_book(document_tags="alpha, beta, gamma")
         client.post(f"/library/ui/book/{book.id}/remove-tag", data={"tag": "beta"})
@@ -213,7 +292,8 @@ class TestBookDelete:
         book_id = book.id
         h = make_highlight(text="Gone too", book=book)
         resp = client.delete(f"/library/ui/book/{book_id}")
-        assert resp.status_code == 200
+        assert resp.status_code == 204
+        assert resp.content == b""
         assert resp.headers.get("HX-Redirect") == "/library/ui"
         db.expire_all()
         assert db.get(Book, book_id) is None
@@ -230,6 +310,16 @@ class TestBookDelete:
         assert db.get(Highlight, h1_id) is None
         assert db.get(Highlight, h2_id) is None
 
+    def test_delete_updates_highlight_count(self, client, db, make_book, make_highlight):
+        from app.db import get_highlight_count
+
+        book = make_book()
+        make_highlight(text="H1", book=book)
+        make_highlight(text="H2", book=book)
+        assert get_highlight_count(db) == 2
+        client.delete(f"/library/ui/book/{book.id}")
+        assert get_highlight_count(db) == 0
+
     def test_delete_404(self, client):
         resp = client.delete("/library/ui/book/9999")
         assert resp.status_code == 404
@@ -246,11 +336,121 @@ class TestCoverDelete:
                          cover_image_source="upload")
         resp = client.post(f"/library/ui/book/{book.id}/cover/delete")
         assert resp.status_code == 200
+        assert "No cover" in resp.text
         db.expire_all()
         updated = db.get(Book, book.id)
         assert updated.cover_image_url is None
         assert updated.cover_image_source is None
 
+    def test_delete_cover_removes_file(self, client, db, make_book, monkeypatch, tmp_path):
+        import app.routers.library as library
+
+        monkeypatch.setattr(library, "COVER_UPLOAD_DIR", str(tmp_path))
+        (tmp_path / "old.jpg").write_bytes(b"jpeg")
+        book = make_book(cover_image_url="/static/uploads/covers/old.jpg",
+                         cover_image_source="upload")
+        resp = client.post(f"/library/ui/book/{book.id}/cover/delete")
+        assert resp.status_code == 200
+        assert not (tmp_path / "old.jpg").exists()
+
     def test_delete_cover_404(self, client):
         resp = client.post("/library/ui/book/9999/cover/delete")
         assert resp.status_code == 404
+
+
+# ── Cover search (Open Library stubbed) ──────────────────────────────────────
+
+class TestCoverSearch:
+    """POST /library/ui/book/{book_id}/cover/search"""
+
+    def test_repeat_search_uses_cache(self, client, make_book, monkeypatch):
+        import app.routers.library as library
+
+        calls = []
+
+        async def fake_search(query):
+            calls.append(query)
+            return [{"cover_id": 42, "title": "Dune", "author": "Frank Herbert", "year": 1965}]
+
+        monkeypatch.setattr(library, "_search_openlibrary", fake_search)
+        book = make_book(title="Dune")
+        first = client.post(f"/library/ui/book/{book.id}/cover/search", data={"query": "Dune"})
+        second = client.post(f"/library/ui/book/{book.id}/cover/search", data={"query": "  dune "})
+        assert first.status_code == second.status_code == 200
+        assert "Frank Herbert" in second.text
+        assert "42-L.jpg" in second.text
+        assert calls == ["Dune"]
+
+    def test_empty_query(self, client, make_book):
+        book = make_book()
+        resp = client.post(f"/library/ui/book/{book.id}/cover/search", data={"query": "  "})
+        assert resp.status_code == 200
+        assert "Enter a search query" in resp.text
+
+
+# ── Cover select (Open Library download stubbed) ─────────────────────────────
+
+class TestCoverSelect:
+    """POST /library/ui/book/{book_id}/cover/select"""
+
+    COVER_URL = "https://covers.openlibrary.org/b/id/42-L.jpg"
+
+    def _stub_download(self, monkeypatch, tmp_path, body, content_type="image/jpeg"):
+        import httpx
+        import app.routers.library as library
+
+        real_client = httpx.AsyncClient
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(200, content=body, headers={"Content-Type": content_type})
+        )
+        monkeypatch.setattr(library.httpx, "AsyncClient", lambda **kw: real_client(transport=transport, **kw))
+        monkeypatch.setattr(library, "COVER_UPLOAD_DIR", str(tmp_path))
+
+    def test_select_saves_cover(self, client, db, make_book, monkeypatch, tmp_path):
+        self._stub_download(monkeypatch, tmp_path, b"\xff\xd8jpeg-bytes")
+        book = make_book()
+        resp = client.post(f"/library/ui/book/{book.id}/cover/select", data={"cover_url": self.COVER_URL})
+        assert resp.status_code == 200
+        files = list(tmp_path.iterdir())
+        assert len(files) == 1
+        assert files[0].suffix == ".jpg"
+        assert files[0].read_bytes() == b"\xff\xd8jpeg-bytes"
+        db.expire_all()
+        updated = db.get(Book, book.id)
+        assert updated.cover_image_url == f"/static/uploads/covers/{files[0].name}"
+        assert updated.cover_image_source == "openlibrary"
+
+    def test_select_too_large(self, client, db, make_book, monkeypatch, tmp_path):
+        import app.routers.library as library
+
+        monkeypatch.setattr(library, "MAX_COVER_SIZE_BYTES", 8)
+        self._stub_download(monkeypatch, tmp_path, b"0123456789")
+        book = make_book()
+        resp = client.post(f"/library/ui/book/{book.id}/cover/select", data={"cover_url": self.COVER_URL})
+        assert resp.status_code == 400
+        assert list(tmp_path.iterdir()) == []
+        db.expire_all()
+        assert db.get(Book, book.id).cover_image_url is None
+
+    def test_select_rejects_foreign_url(self, client, make_book):
+        book = make_book()
+        resp = client.post(f"/library/ui/book/{book.id}/cover/select",
+                           data={"cover_url": "https://example.com/cover.jpg"})
+        assert resp.status_code == 400
+
+
+class TestFragmentCaching:
+    """Rendered fragments are memoized only when templates do not reload."""
+
+    def test_not_cached_in_development(self, monkeypatch):
+        from app.routers import library
+
+        monkeypatch.setattr(library, "TEMPLATE_CACHE_ENABLED", False)
+        render = lambda: "html"
+        assert library._cache_rendered(render) is render
+
+    def test_cached_in_production(self, monkeypatch):
+        from app.routers import library
+
+        monkeypatch.setattr(library, "TEMPLATE_CACHE_ENABLED", True)
+        assert hasattr(library._cache_rendered(lambda: "html"), "cache_clear")
@@ -3,7 +3,7 @@ Tests for the Meebook / Haoqing HTML import.
 """
 import io
 
-from sqlmodel import select
+from sqlmodel import select, func
 
 from app.models import Book, Highlight
 from app.utils.meebook import extract_highlights, parse_date, extract_title_author
@@ -142,8 +142,7 @@ class TestMeebookImportUpload:
         books = db.exec(select(Book)).all()
         assert len(books) == 1
         assert books[0].title == "Test Book"
-        highlights = db.exec(select(Highlight)).all()
-        assert len(highlights) == 2
+        assert db.exec(select(func.count()).select_from(Highlight)).one() == 2
 
     def test_location_type_stored(self, client, db):
         self._upload(client, SAMPLE_HTML)
@@ -154,7 +153,7 @@ class TestMeebookImportUpload:
     def test_deduplication(self, client, db):
         self._upload(client, SAMPLE_HTML)
         self._upload(client, SAMPLE_HTML)
-        assert len(db.exec(select(Highlight)).all()) == 2  # not 4
+        assert db.exec(select(func.count()).select_from(Highlight)).one() == 2  # not 4
 
     def test_reject_non_html(self, client):
         buf = io.BytesIO(b"not html")
@@ -109,18 +109,15 @@ class TestTagModel:
 
     def test_highlight_tag_link(self, db, make_highlight):
         h = make_highlight(text="Tagged highlight")
-        tag = Tag(name="science")
-        db.add(tag)
-        db.commit()
-        db.refresh(tag)
+        tags = [Tag(name="science"), Tag(name="history")]
+        db.add_all(tags)
+        db.flush()
 
-        link = HighlightTag(highlight_id=h.id, tag_id=tag.id)
-        db.add(link)
+        db.add_all([HighlightTag(highlight_id=h.id, tag_id=t.id) for t in tags])
         db.commit()
 
         # Query back
         found = db.exec(
             select(HighlightTag).where(HighlightTag.highlight_id == h.id)
-        ).first()
-        assert found is not None
-        assert found.tag_id == tag.id
+        ).all()
+        assert {link.tag_id for link in found} == {t.id for t in tags}
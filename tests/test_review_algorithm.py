@@ -112,23 +112,21 @@ class TestDiscardedExclusion:
 class TestDiversity:
     """Per-book cap ensures variety in review selection."""
 
-    def test_no_duplicates(self, client, db, make_book, make_highlight):
+    def test_no_duplicates(self, client, db, make_book, make_highlights):
         """Each highlight should appear at most once per review."""
         b = make_book(title="One Book")
-        for i in range(10):
-            make_highlight(text=f"HL {i}", book=b,
-                           created_at=datetime(2024, 1, 1))
+        make_highlights([f"HL {i}" for i in range(10)], book=b,
+                        created_at=datetime(2024, 1, 1))
         resp = client.get("/highlights/review/", params={"n": 5})
         ids = [h["id"] for h in resp.json()]
         assert len(ids) == len(set(ids))
 
-    def test_per_book_cap_respected(self, client, db, make_book, make_highlight):
+    def test_per_book_cap_respected(self, client, db, make_book, make_highlights):
         """With n≥4, max 2 highlights per book when enough books exist."""
         books = [make_book(title=f"Book {i}") for i in range(5)]
         for b in books:
-            for j in range(5):
-                make_highlight(text=f"{b.title} HL {j}", book=b,
-                               created_at=datetime(2024, 1, 1))
+            make_highlights([f"{b.title} HL {j}" for j in range(5)], book=b,
+                            created_at=datetime(2024, 1, 1))
 
         for _ in range(20):
             resp = client.get("/highlights/review/", params={"n": 5})
@@ -137,12 +135,11 @@ class TestDiversity:
             for count in book_counts.values():
                 assert count <= 2
 
-    def test_fill_from_single_book(self, client, db, make_book, make_highlight):
+    def test_fill_from_single_book(self, client, db, make_book, make_highlights):
         """If only one book exists, should still fill up to n."""
         b = make_book(title="Only Book")
-        for i in range(10):
-            make_highlight(text=f"HL {i}", book=b,
-                           created_at=datetime(2024, 1, 1))
+        make_highlights([f"HL {i}" for i in range(10)], book=b,
+                        created_at=datetime(2024, 1, 1))
         resp = client.get("/highlights/review/", params={"n": 5})
         assert len(resp.json()) == 5
 
@@ -20,6 +20,7 @@ class TestSettingsPage:
         resp = client.get("/settings/ui")
         assert resp.status_code == 200
         # The page should display "2" somewhere for the highlight count
+        assert resp.context["highlights_count"] == 2
 
 
 class TestUpdateSettings:
@@ -92,7 +93,7 @@ class TestUpdateSettings:
 class TestResetLibrary:
     """POST /settings/reset-library — nuclear reset."""
 
-    def test_reset_clears_all_data(self, client, db, make_highlight, make_book):
+    def test_reset_clears_all_data(self, client, db, make_highlight, make_book, reseed_user):
         book = make_book(title="Doomed Book")
         make_highlight(text="Doomed", book=book)
 
@@ -113,6 +114,6 @@ class TestResetLibrary:
             assert settings is not None
             assert settings.daily_review_count == 5
 
-    def test_reset_message(self, client):
+    def test_reset_message(self, client, reseed_user):
         resp = client.post("/settings/reset-library")
         assert "reset" in resp.text.lower() or "deleted" in resp.text.lower()
@@ -5,29 +5,32 @@ from app.utils.tags import parse_tags, join_tags
 
 
 class TestParseTags:
-    """parse_tags() splits comma-separated strings into trimmed lists."""
+    """parse_tags() splits comma-separated strings into trimmed tuples."""
 
     def test_normal_input(self):
-        assert parse_tags("python, fastapi, web") == ["python", "fastapi", "web"]
+        assert parse_tags("python, fastapi, web") == ("python", "fastapi", "web")
 
     def test_extra_whitespace(self):
-        assert parse_tags("  tag1  ,  tag2  ") == ["tag1", "tag2"]
+        assert parse_tags("  tag1  ,  tag2  ") == ("tag1", "tag2")
 
     def test_empty_string(self):
-        assert parse_tags("") == []
+        assert parse_tags("") == ()
 
     def test_whitespace_only(self):
-        assert parse_tags("   ") == []
+        assert parse_tags("   ") == ()
 
     def test_single_tag(self):
-        assert parse_tags("alone") == ["alone"]
+        assert parse_tags("alone") == ("alone",)
 
     def test_trailing_comma(self):
         # Trailing comma produces an empty split element, which should be filtered
-        assert parse_tags("a, b, ") == ["a", "b"]
+        assert parse_tags("a, b, ") == ("a", "b")
 
     def test_consecutive_commas(self):
-        assert parse_tags("a,,b") == ["a", "b"]
+        assert parse_tags("a,,b") == ("a", "b")
+
+    def test_repeat_call_is_cached(self):
+        assert parse_tags("x, y") is parse_tags("x, y")
 
 
 class TestJoinTags:
@@ -47,3 +50,6 @@ class TestJoinTags:
 
     def test_filters_empty_strings(self):
         assert join_tags(["a", "", "  ", "b"]) == "a, b"
+
+    def test_accepts_tuple(self):
+        assert join_tags(parse_tags("a, b")) == "a, b"